@@ -0,0 +1,42 @@
+"""
+ctypes binding for the fastpbkdf2 C library (https://github.com/ctz/fastpbkdf2)
+Raises ImportError when libfastpbkdf2 cannot be loaded so callers can fall back
+to hashlib.pbkdf2_hmac
+"""
+
+import ctypes
+import ctypes.util
+import os
+
+_lib_path = (
+    os.getenv("FASTPBKDF2_LIB")
+    or ctypes.util.find_library("fastpbkdf2")
+    or "libfastpbkdf2.so"
+)
+
+try:
+    _lib = ctypes.CDLL(_lib_path)
+except OSError as e:
+    raise ImportError(f"libfastpbkdf2 not available: {e}") from e
+
+# void fastpbkdf2_hmac_sha256(const uint8_t *pw, size_t npw,
+#                             const uint8_t *salt, size_t nsalt,
+#                             uint32_t iterations,
+#                             uint8_t *out, size_t nout);
+_lib.fastpbkdf2_hmac_sha256.argtypes = [
+    ctypes.c_char_p, ctypes.c_size_t,
+    ctypes.c_char_p, ctypes.c_size_t,
+    ctypes.c_uint32,
+    ctypes.c_char_p, ctypes.c_size_t,
+]
+_lib.fastpbkdf2_hmac_sha256.restype = None
+
+
+def pbkdf2_hmac_sha256(password: bytes, salt: bytes, iterations: int, dklen: int = 32) -> bytes:
+    """PBKDF2-HMAC-SHA256, same output as hashlib.pbkdf2_hmac('sha256', ...)"""
+    # ctypes releases the GIL for the duration of the call
+    out = ctypes.create_string_buffer(dklen)
+    _lib.fastpbkdf2_hmac_sha256(
+        password, len(password), salt, len(salt), iterations, out, dklen
+    )
+    return out.raw
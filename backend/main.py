@@ -3,50 +3,333 @@ FastAPI backend for ReadAloud ebook reader
 Provides secure authentication and Google Cloud TTS proxy
 """
 
-from fastapi import FastAPI, HTTPException, Depends, status
+from fastapi import FastAPI, HTTPException, Depends, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, Response
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel
 from typing import Optional
 import os
+import time
+import asyncio
+from collections import OrderedDict, defaultdict
+from contextlib import asynccontextmanager, suppress
+from functools import lru_cache, partial
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from jose import JWTError, jwt
+import jwt
+from jwt import InvalidTokenError as JWTError
 import hashlib
 import hmac
-from google.cloud import texttospeech, storage
-import firebase_admin
-from firebase_admin import credentials, firestore
+try:
+    # ctypes binding to libfastpbkdf2, 2-3x faster than OpenSSL's PBKDF2
+    from _fastpbkdf2 import pbkdf2_hmac_sha256
+except ImportError:
+    def pbkdf2_hmac_sha256(password: bytes, salt: bytes, iterations: int, dklen: int = 32) -> bytes:
+        return hashlib.pbkdf2_hmac('sha256', password, salt, iterations, dklen)
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
+from google.cloud import texttospeech, storage, firestore
+from google.api_core.exceptions import AlreadyExists, BadRequest
 import base64
-from tts_provider import get_tts_provider
+import orjson
+import msgspec
+from tts_provider import get_tts_provider, VOICES, VOICE_LANGUAGES
 from google.auth import compute_engine
 from google.auth.transport import requests as google_requests
 import google.auth
 
 # Configuration
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-this")
+_SECRET_KEY_BYTES = SECRET_KEY.encode('utf-8')
 INVITATION_CODE = os.getenv("INVITATION_CODE", "")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 525600 * 10  # 10 years (effectively never expires)
 
-# Initialize Firebase Admin
-try:
-    # Use default credentials from GOOGLE_APPLICATION_CREDENTIALS env var
-    firebase_admin.initialize_app()
-    # Use the book-store database instead of (default)
-    db = firestore.client(database_id='book-store')
-    print("✅ Firestore initialized successfully with database: book-store")
-except Exception as e:
-    print(f"⚠️  Firestore initialization warning: {e}")
-    db = None
-
-# Password salt for hashing
+# Firestore client (async, created in lifespan)
+db = None
+
+# Password salt for legacy PBKDF2 hashes (new hashes use a per-user Argon2 salt)
 PASSWORD_SALT = os.getenv("SECRET_KEY", "your-secret-key-change-this")
+_SALT_BYTES = PASSWORD_SALT.encode('utf-8')
+
+# Argon2id password hasher
+password_hasher = PasswordHasher(time_cost=2, memory_cost=65536, parallelism=1)
+
+# Thread pool for password hashing (argon2 and PBKDF2 release the GIL)
+_HASH_POOL = ThreadPoolExecutor(max_workers=os.cpu_count())
+
+# How long a successful login skips password verification, in seconds
+VERIFIED_LOGIN_TTL = 60
+
+# How long a verified access token skips JWT decoding, in seconds
+TOKEN_CACHE_TTL = 30
+
+# Request size limits
+MAX_TEXT_LENGTH = 5000  # UTF-8 bytes per synthesize request (Google TTS limit)
+MAX_BODY_SIZE = 64 * 1024  # bytes, for JSON API requests
+
+# Payloads larger than this are base64 encoded/decoded on a worker thread
+BASE64_INLINE_LIMIT = 64 * 1024  # bytes
+
+# Lifetime of signed URLs for direct book upload/download
+BOOK_URL_EXPIRE_MINUTES = 15
+
+# Largest book file clients may upload to Cloud Storage
+MAX_BOOK_SIZE = int(os.getenv("MAX_BOOK_SIZE", str(100 * 1024 * 1024)))  # bytes
+
+# Maximum concurrent Google TTS requests per worker; the rest queue in-process
+TTS_MAX_CONCURRENCY = int(os.getenv("TTS_MAX_CONCURRENCY", "8"))
+
+# Byte budget for the in-process cache of synthesized audio
+TTS_CACHE_MAX_BYTES = int(os.getenv("TTS_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
 
 # Security
 security = HTTPBearer()
 
+# Character usage is aggregated in memory and flushed to Firestore in batches,
+# every USAGE_FLUSH_INTERVAL seconds or as soon as a full batch of users is pending
+USAGE_FLUSH_INTERVAL = float(os.getenv("USAGE_FLUSH_INTERVAL", "5"))  # seconds
+FIRESTORE_BATCH_LIMIT = 500  # max writes per batch commit
+_usage_deltas = defaultdict(int)
+_background_tasks = set()  # Firestore writes that shutdown must wait for
+
+
+def run_in_background(coro) -> asyncio.Task:
+    task = asyncio.get_running_loop().create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+
+def record_usage(username: str, characters: int):
+    if not db:
+        return
+    _usage_deltas[username] += characters
+    if len(_usage_deltas) >= FIRESTORE_BATCH_LIMIT:
+        run_in_background(_commit_usage(_take_usage()))
+
+
+def _take_usage() -> list:
+    # Swap the dict so requests keep recording while we commit
+    global _usage_deltas
+    pending, _usage_deltas = list(_usage_deltas.items()), defaultdict(int)
+    return pending
+
+
+async def flush_usage():
+    """Write pending usage increments to Firestore"""
+    await _commit_usage(_take_usage())
+
+
+async def _commit_usage(pending: list):
+    """Commit usage increments, one batch per 500 users"""
+    if not pending or not db:
+        return
+
+    committed = 0
+    try:
+        for i in range(0, len(pending), FIRESTORE_BATCH_LIMIT):
+            batch = db.batch()
+            for username, characters in pending[i:i + FIRESTORE_BATCH_LIMIT]:
+                # merge=True so a missing user document can't fail the whole batch
+                batch.set(
+                    db.collection('users').document(username),
+                    {"total_characters_used": firestore.Increment(characters)},
+                    merge=True,
+                )
+            await batch.commit()
+            committed = i + FIRESTORE_BATCH_LIMIT
+    except Exception as e:
+        print(f"⚠️  Failed to flush usage to Firestore: {e}")
+        # Put uncommitted increments back so the next flush retries them
+        for username, characters in pending[committed:]:
+            _usage_deltas[username] += characters
+
+
+# Reading positions are group-committed: saves arriving within one interval
+# share a single batch, and each request waits until its batch is committed
+POSITION_FLUSH_INTERVAL = 0.1  # seconds
+# (username, bookId) -> (document reference, latest position data, waiting futures)
+_pending_positions = {}
+
+# Write errors that retrying will not fix
+_PERMANENT_WRITE_ERRORS = (BadRequest, ValueError)
+
+
+def queue_position(username: str, position_ref, position_data: dict) -> asyncio.Future:
+    """Queue a position for the next batch; the future resolves once it is committed"""
+    future = asyncio.get_running_loop().create_future()
+    key = (username, position_data['bookId'])
+    pending = _pending_positions.get(key)
+    # A newer save of the same book replaces the data but waits on the same write
+    futures = pending[2] if pending else []
+    futures.append(future)
+    _pending_positions[key] = (position_ref, position_data, futures)
+    return future
+
+
+def _resolve_positions(futures: list, error: Optional[Exception] = None):
+    for future in futures:
+        # The waiting request may have been cancelled by a disconnect
+        if future.done():
+            continue
+        if error is None:
+            future.set_result(None)
+        else:
+            future.set_exception(error)
+
+
+async def flush_positions():
+    """Commit queued reading positions, one batch per 500 books"""
+    global _pending_positions
+    if not _pending_positions:
+        return
+
+    # Swap the dict so new saves queue for the next batch while we commit
+    pending, _pending_positions = list(_pending_positions.values()), {}
+    for i in range(0, len(pending), FIRESTORE_BATCH_LIMIT):
+        entries = pending[i:i + FIRESTORE_BATCH_LIMIT]
+        try:
+            batch = db.batch()
+            for position_ref, position_data, _ in entries:
+                batch.set(position_ref, position_data)
+            await batch.commit()
+        except _PERMANENT_WRITE_ERRORS as e:
+            # A batch fails as a whole; write one by one so a single bad
+            # position only fails its own request
+            print(f"⚠️  Failed to commit reading positions batch, retrying individually: {e}")
+            await asyncio.gather(*(_write_position(entry) for entry in entries))
+            continue
+        except Exception as e:
+            print(f"⚠️  Failed to commit reading positions to Firestore: {e}")
+            for _, _, futures in entries:
+                _resolve_positions(futures, e)
+            continue
+
+        for _, _, futures in entries:
+            _resolve_positions(futures)
+
+
+async def _write_position(entry):
+    position_ref, position_data, futures = entry
+    try:
+        await position_ref.set(position_data)
+    except Exception as e:
+        _resolve_positions(futures, e)
+    else:
+        _resolve_positions(futures)
+
+
+def init_firestore():
+    """Connect to the book-store Firestore database, or return None if unavailable"""
+    try:
+        # Use default credentials from GOOGLE_APPLICATION_CREDENTIALS env var.
+        # Use the book-store database instead of (default). The async client
+        # shares one gRPC channel and doesn't block the event loop.
+        client = firestore.AsyncClient(database='book-store')
+        print("✅ Firestore initialized successfully with database: book-store")
+        return client
+    except Exception as e:
+        print(f"⚠️  Firestore initialization warning: {e}")
+        return None
+
+
+async def _flush_loop(flush, interval: float):
+    while True:
+        await asyncio.sleep(interval)
+        # Tracked so shutdown waits for an in-flight flush instead of leaving
+        # it orphaned when this loop is cancelled
+        await asyncio.shield(run_in_background(flush()))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global db, tts_client, tts_semaphore, bucket, signing_credentials, SERVICE_ACCOUNT_EMAIL
+    # gRPC channels and the semaphore are created per worker, on the server's event loop
+    db = init_firestore()
+    tts_client = texttospeech.TextToSpeechAsyncClient()
+    tts_semaphore = asyncio.Semaphore(TTS_MAX_CONCURRENCY)
+    # The Cloud Storage and IAM checks are blocking network calls; run them
+    # off the loop, side by side
+    bucket, signing_credentials = await asyncio.gather(
+        run_blocking(init_bucket),
+        run_blocking(init_signing_credentials),
+    )
+    if signing_credentials:
+        SERVICE_ACCOUNT_EMAIL = signing_credentials.service_account_email
+    flush_tasks = [
+        asyncio.create_task(_flush_loop(flush_usage, USAGE_FLUSH_INTERVAL)),
+        asyncio.create_task(_flush_loop(flush_positions, POSITION_FLUSH_INTERVAL)),
+    ]
+    yield
+    for task in flush_tasks:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+    if _background_tasks:
+        await asyncio.gather(*_background_tasks)
+    await flush_usage()
+    await flush_positions()
+    await tts_client.transport.close()
+
+
 # FastAPI app
-app = FastAPI(title="ReadAloud API", version="1.0.0")
+app = FastAPI(
+    title="ReadAloud API",
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
+)
+
+
+class BodySizeLimitMiddleware:
+    """
+    Pure ASGI middleware that rejects request bodies over max_body_size with a 413
+
+    A bad or oversized Content-Length is refused before the app runs; bodies
+    without one (chunked) are counted as they are received.
+    """
+
+    def __init__(self, app, max_body_size: int):
+        self.app = app
+        self.max_body_size = max_body_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        for name, value in scope["headers"]:
+            if name == b"content-length":
+                if not value.isdigit() or int(value) > self.max_body_size:
+                    response = ORJSONResponse(
+                        {"detail": "Request body too large"},
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    )
+                    return await response(scope, receive, send)
+                break
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body_size:
+                    # Raised inside the handler's body read, so the app's
+                    # exception handling turns it into the response
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail="Request body too large",
+                    )
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+# Registered before CORSMiddleware so the 413 still carries CORS headers
+app.add_middleware(BodySizeLimitMiddleware, max_body_size=MAX_BODY_SIZE)
 
 # CORS configuration
 app.add_middleware(
@@ -59,63 +342,79 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Character-Count"],
 )
 
-# Google Cloud TTS client
-tts_client = texttospeech.TextToSpeechClient()
+# Google Cloud TTS client (async, created in lifespan)
+tts_client = None
+tts_semaphore = None
+_tts_stats = {"waiting": 0, "inFlight": 0}
 
-# Google Cloud Storage client
-storage_client = storage.Client()
+# Google Cloud Storage bucket and signing credentials (set up in lifespan)
 BUCKET_NAME = os.getenv("GCS_BUCKET_NAME", "readaloud-books")
+bucket = None
+signing_credentials = None
+SERVICE_ACCOUNT_EMAIL = None
+
+
+def init_signing_credentials():
+    """Get credentials for signing with IAM scope, or None if unavailable"""
+    try:
+        credentials, project = google.auth.default(
+            scopes=["https://www.googleapis.com/auth/iam"]
+        )
+        credentials.refresh(google_requests.Request())
+        print(f"✅ Using service account for signing: {credentials.service_account_email}")
+        return credentials
+    except Exception as e:
+        print(f"⚠️  Could not get signing credentials: {e}")
+        return None
+
+
+def init_bucket():
+    """Get the books bucket, creating it if it doesn't exist, or None if unavailable"""
+    try:
+        storage_client = storage.Client()
+        bucket = storage_client.bucket(BUCKET_NAME)
+        if not bucket.exists():
+            bucket = storage_client.create_bucket(BUCKET_NAME, location="us-central1")
+            print(f"✅ Created Cloud Storage bucket: {BUCKET_NAME}")
+        else:
+            print(f"✅ Using existing Cloud Storage bucket: {BUCKET_NAME}")
+        return bucket
+    except Exception as e:
+        print(f"⚠️  Cloud Storage warning: {e}")
+        return None
 
-# Get credentials for signing with IAM scope
-try:
-    signing_credentials, project = google.auth.default(
-        scopes=["https://www.googleapis.com/auth/iam"]
-    )
-    signing_credentials.refresh(google_requests.Request())
-    SERVICE_ACCOUNT_EMAIL = signing_credentials.service_account_email
-    print(f"✅ Using service account for signing: {SERVICE_ACCOUNT_EMAIL}")
-except Exception as e:
-    print(f"⚠️  Could not get signing credentials: {e}")
-    signing_credentials = None
-    SERVICE_ACCOUNT_EMAIL = None
-
-# Create bucket if it doesn't exist
-try:
-    bucket = storage_client.bucket(BUCKET_NAME)
-    if not bucket.exists():
-        bucket = storage_client.create_bucket(BUCKET_NAME, location="us-central1")
-        print(f"✅ Created Cloud Storage bucket: {BUCKET_NAME}")
-    else:
-        print(f"✅ Using existing Cloud Storage bucket: {BUCKET_NAME}")
-except Exception as e:
-    print(f"⚠️  Cloud Storage warning: {e}")
-    bucket = None
+
+# The voice list never changes, so serialize it once
+_VOICES_BYTES = orjson.dumps({"voices": VOICES})
+_VOICES_ETAG = '"' + hashlib.sha1(_VOICES_BYTES).hexdigest() + '"'
+_VOICES_HEADERS = {"Cache-Control": "public, max-age=86400", "ETag": _VOICES_ETAG}
+
+
+# Book fields returned by the listing endpoint
+BOOK_LIST_FIELDS = ["title", "author", "fileType", "uploadedAt", "storagePath", "fileSize"]
 
 
 # Models
-class UserRegister(BaseModel):
+# Hot-path request bodies are msgspec Structs, decoded by json_body()
+class UserRegister(msgspec.Struct):
     username: str
     password: str
     invitationCode: str
 
 
-class UserLogin(BaseModel):
+class UserLogin(msgspec.Struct):
     username: str
     password: str
 
 
-class Token(BaseModel):
-    access_token: str
-    token_type: str
-
-
-class TTSRequest(BaseModel):
-    text: str
+class TTSRequest(msgspec.Struct):
+    text: str  # Length is checked by synthesize, which returns a 400 with a clear message
     voiceId: str
     speed: float = 1.0
-    pitch: float = 0
+    pitch: float = 0.0
 
 
 class Voice(BaseModel):
@@ -125,15 +424,21 @@ class Voice(BaseModel):
     gender: str
 
 
-class BookMetadata(BaseModel):
+class BookMetadata(msgspec.Struct):
     title: str
-    author: Optional[str] = None
     fileType: str  # 'epub' or 'pdf'
+    author: Optional[str] = None
     uploadedAt: Optional[str] = None
-    fileData: Optional[str] = None  # Base64 encoded file data
+    storagePath: Optional[str] = None  # From /api/books/upload-url, once uploaded
 
 
-class ReadingPosition(BaseModel):
+class BookUpload(msgspec.Struct):
+    title: str
+    fileType: str  # 'epub' or 'pdf'
+    fileSize: int
+
+
+class ReadingPosition(msgspec.Struct):
     bookId: str
     type: str  # 'epub' or 'pdf'
     cfi: Optional[str] = None  # For EPUB positions
@@ -180,50 +485,325 @@ class LogEntry(BaseModel):
     timestamp: Optional[str] = None
 
 
+class ExpiringCache:
+    """Small in-process LRU cache whose entries expire after a TTL (not thread-safe)"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+
+    def get(self, key, default=None):
+        item = self._data.get(key)
+        if item is None:
+            return default
+        value, expires_at = item
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key, value, ttl: Optional[float] = None):
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        self._data[key] = (value, time.monotonic() + ttl)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+
+class AudioCache:
+    """In-process LRU cache of synthesized audio, bounded by total bytes"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._data = OrderedDict()
+
+    def get(self, key) -> Optional[bytes]:
+        value = self._data.get(key)
+        if value is not None:
+            self._data.move_to_end(key)
+        return value
+
+    def set(self, key, value: bytes):
+        if len(value) > self.max_bytes:
+            return
+        previous = self._data.pop(key, None)
+        if previous is not None:
+            self.size -= len(previous)
+        self._data[key] = value
+        self.size += len(value)
+        while self.size > self.max_bytes:
+            _, evicted = self._data.popitem(last=False)
+            self.size -= len(evicted)
+
+
+# Recently verified logins: (username, stored hash, password digest) -> True
+_verified_logins = ExpiringCache(maxsize=1024, ttl=VERIFIED_LOGIN_TTL)
+
+# Recently verified access tokens: token digest -> username
+_verified_tokens = ExpiringCache(maxsize=10000, ttl=TOKEN_CACHE_TTL)
+
+# Synthesized audio: digest of (voice, speed, pitch, text) -> MP3 bytes
+_tts_cache = AudioCache(max_bytes=TTS_CACHE_MAX_BYTES)
+
+
 # Helper functions
+def json_body(model):
+    """Dependency that decodes the JSON request body into a msgspec Struct"""
+    async def decode(request: Request):
+        try:
+            return msgspec.json.decode(await request.body(), type=model)
+        except msgspec.DecodeError as e:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=str(e),
+            )
+    return decode
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    computed_hash = get_password_hash(plain_password)
-    return hmac.compare_digest(computed_hash, hashed_password)
+    if hashed_password.startswith("$argon2"):
+        try:
+            return password_hasher.verify(hashed_password, plain_password)
+        except (VerificationError, InvalidHashError):
+            return False
+    # Legacy PBKDF2 hash, stored as hex
+    try:
+        stored_hash = bytes.fromhex(hashed_password)
+    except ValueError:
+        return False
+    return hmac.compare_digest(get_legacy_password_hash(plain_password), stored_hash)
+
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    if not hashed_password.startswith("$argon2"):
+        return True
+    return password_hasher.check_needs_rehash(hashed_password)
 
 
 def get_password_hash(password: str) -> str:
-    # Use PBKDF2 for password hashing (secure and built-in)
-    return hashlib.pbkdf2_hmac(
-        'sha256',
+    # Argon2id with a random per-user salt stored inside the encoded hash
+    return password_hasher.hash(password)
+
+
+def get_legacy_password_hash(password: str) -> bytes:
+    # PBKDF2 with the shared salt, used by accounts created before Argon2
+    return pbkdf2_hmac_sha256(
         password.encode('utf-8'),
-        PASSWORD_SALT.encode('utf-8'),
+        _SALT_BYTES,
         100000  # iterations
-    ).hex()
+    )
+
+
+@lru_cache(maxsize=256)
+def get_voice_params(voice_id: str) -> texttospeech.VoiceSelectionParams:
+    # Cached protos are shared between requests and must not be mutated
+    return texttospeech.VoiceSelectionParams(
+        language_code=VOICE_LANGUAGES[voice_id],
+        name=voice_id
+    )
+
+
+@lru_cache(maxsize=256)
+def _audio_config(speed: float, pitch: float) -> texttospeech.AudioConfig:
+    return texttospeech.AudioConfig(
+        audio_encoding=texttospeech.AudioEncoding.MP3,
+        speaking_rate=speed,
+        pitch=pitch,
+        sample_rate_hertz=24000
+    )
+
+
+def get_audio_config(speed: float, pitch: float) -> texttospeech.AudioConfig:
+    # Clamp and round so near-identical values share one cached proto
+    return _audio_config(
+        round(max(0.25, min(4.0, speed)), 2),
+        round(max(-20.0, min(20.0, pitch)), 1),
+    )
+
+
+_last_iso_second = 0
+_last_iso = ""
+
+
+def now_iso() -> str:
+    """Current UTC time as a second-precision ISO-8601 string, cached per second"""
+    global _last_iso_second, _last_iso
+    second = int(time.time())
+    if second != _last_iso_second:
+        _last_iso_second = second
+        _last_iso = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(second))
+    return _last_iso
+
+
+async def run_blocking(fn, *args, **kwargs):
+    """Run a blocking call (GCS, IAM) on the default thread pool"""
+    return await asyncio.get_running_loop().run_in_executor(
+        None, partial(fn, *args, **kwargs)
+    )
+
+
+def generate_signed_url(blob, expiration: timedelta, method: str = "GET",
+                        content_type: Optional[str] = None,
+                        headers: Optional[dict] = None) -> str:
+    """Generate a V4 signed URL using IAM signBlob (blocking)"""
+    # Refresh credentials to get fresh access token
+    signing_credentials.refresh(google_requests.Request())
+    return blob.generate_signed_url(
+        version="v4",
+        expiration=expiration,
+        method=method,
+        content_type=content_type,
+        headers=headers,
+        service_account_email=SERVICE_ACCOUNT_EMAIL,
+        access_token=signing_credentials.token
+    )
+
+
+async def _hash_async(password: str) -> str:
+    return await asyncio.get_running_loop().run_in_executor(
+        _HASH_POOL, get_password_hash, password
+    )
+
+
+async def _verify_async(username: str, plain_password: str, hashed_password: str) -> bool:
+    # Keyed on the stored hash too, so a password change invalidates the entry
+    cache_key = (
+        username,
+        hashed_password,
+        hashlib.blake2b(plain_password.encode('utf-8'), digest_size=32).digest(),
+    )
+    if _verified_logins.get(cache_key):
+        return True
+
+    verified = await asyncio.get_running_loop().run_in_executor(
+        _HASH_POOL, verify_password, plain_password, hashed_password
+    )
+    if verified:
+        _verified_logins.set(cache_key, True)
+    return verified
+
+
+def _b64encode_str(data: bytes) -> str:
+    return base64.b64encode(data).decode('utf-8')
+
+
+async def encode_base64(data: bytes) -> str:
+    """Base64 encode, on a worker thread for large payloads"""
+    if len(data) > BASE64_INLINE_LIMIT:
+        return await run_blocking(_b64encode_str, data)
+    return _b64encode_str(data)
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """If-None-Match check with weak comparison, tag lists and '*' (RFC 9110)"""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+async def synthesize_speech(**kwargs):
+    """Call Google TTS while holding one of the TTS_MAX_CONCURRENCY slots"""
+    _tts_stats["waiting"] += 1
+    try:
+        await tts_semaphore.acquire()
+    finally:
+        _tts_stats["waiting"] -= 1
+    _tts_stats["inFlight"] += 1
+    try:
+        return await tts_client.synthesize_speech(**kwargs)
+    finally:
+        _tts_stats["inFlight"] -= 1
+        tts_semaphore.release()
+
+
+def require_voice(voice_id: str):
+    """Reject voice IDs that are not in the supported voice list"""
+    if voice_id not in VOICE_LANGUAGES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown voice: {voice_id}",
+        )
+
+
+def is_valid_document_id(doc_id: str) -> bool:
+    """Whether Firestore accepts doc_id as a document ID"""
+    return (
+        0 < len(doc_id.encode('utf-8')) <= 1500
+        and '/' not in doc_id
+        and doc_id not in ('.', '..')
+        and not (len(doc_id) >= 4 and doc_id.startswith('__') and doc_id.endswith('__'))
+    )
+
+
+def wants_json(request: Request) -> bool:
+    """Whether the client explicitly asked for a JSON body instead of raw bytes"""
+    return "application/json" in request.headers.get("accept", "")
+
+
+def _b64url(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode('ascii')
+
+
+# The HS256 header and the HMAC key schedule never change, so build them once
+_JWT_HEADER_B64 = _b64url(b'{"alg":"HS256","typ":"JWT"}')
+_JWT_HMAC = hmac.new(_SECRET_KEY_BYTES, digestmod=hashlib.sha256)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(minutes=15)
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-    return encoded_jwt
+    if not expires_delta:
+        expires_delta = timedelta(minutes=15)
+    to_encode.update({"exp": int(time.time() + expires_delta.total_seconds())})
 
+    # Sign directly instead of going through jwt.encode; tokens are still
+    # standard HS256 JWTs that jwt.decode verifies
+    signing_input = f"{_JWT_HEADER_B64}.{_b64url(orjson.dumps(to_encode))}"
+    mac = _JWT_HMAC.copy()
+    mac.update(signing_input.encode('ascii'))
+    return f"{signing_input}.{_b64url(mac.digest())}"
 
-def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    try:
-        token = credentials.credentials
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid authentication credentials",
-            )
+
+def token_response(username: str) -> ORJSONResponse:
+    access_token = create_access_token(
+        data={"sub": username},
+        expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES),
+    )
+    return ORJSONResponse({"access_token": access_token, "token_type": "bearer"})
+
+
+async def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    # async so it runs on the event loop: the work is all in memory, and
+    # _verified_tokens is not thread-safe
+    token = credentials.credentials
+    # Key on a digest so the cache doesn't hold bearer tokens
+    cache_key = hashlib.sha256(token.encode('utf-8')).digest()[:16]
+    username = _verified_tokens.get(cache_key)
+    if username is not None:
         return username
+
+    try:
+        payload = jwt.decode(token, _SECRET_KEY_BYTES, algorithms=[ALGORITHM])
+        username = payload.get("sub")
     except JWTError:
+        username = None
+
+    if username is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid authentication credentials",
         )
 
+    # Never cache a token beyond its own expiry
+    expires_in = payload.get("exp", float("inf")) - time.time()
+    _verified_tokens.set(cache_key, username, ttl=expires_in)
+    return username
+
 
 # Routes
 @app.get("/")
@@ -233,11 +813,11 @@ async def root():
 
 @app.get("/api/health")
 async def health():
-    return {"status": "ok", "timestamp": datetime.now().isoformat()}
+    return {"status": "ok", "timestamp": now_iso(), "tts": _tts_stats}
 
 
-@app.post("/api/register", response_model=Token)
-async def register(user: UserRegister):
+@app.post("/api/register")
+async def register(user: UserRegister = Depends(json_body(UserRegister))):
     if not db:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
@@ -251,37 +831,28 @@ async def register(user: UserRegister):
             detail="Invalid invitation code",
         )
 
-    # Check if user exists
+    # Create user in Firestore; create() fails atomically if the user exists
     user_ref = db.collection('users').document(user.username)
-    user_doc = user_ref.get()
-
-    if user_doc.exists:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Username already exists",
-        )
-
-    # Create user in Firestore
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await _hash_async(user.password)
     user_data = {
         "username": user.username,
         "hashed_password": hashed_password,
-        "created_at": datetime.now().isoformat(),
+        "created_at": now_iso(),
         "total_characters_used": 0,
     }
-    user_ref.set(user_data)
-
-    # Generate token
-    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        data={"sub": user.username}, expires_delta=access_token_expires
-    )
+    try:
+        await user_ref.create(user_data)
+    except AlreadyExists:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Username already exists",
+        )
 
-    return {"access_token": access_token, "token_type": "bearer"}
+    return token_response(user.username)
 
 
-@app.post("/api/login", response_model=Token)
-async def login(user: UserLogin):
+@app.post("/api/login")
+async def login(user: UserLogin = Depends(json_body(UserLogin))):
     if not db:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
@@ -290,7 +861,7 @@ async def login(user: UserLogin):
 
     # Get user from Firestore
     user_ref = db.collection('users').document(user.username)
-    user_doc = user_ref.get()
+    user_doc = await user_ref.get(field_paths=["hashed_password"])
 
     if not user_doc.exists:
         raise HTTPException(
@@ -299,111 +870,97 @@ async def login(user: UserLogin):
         )
 
     user_data = user_doc.to_dict()
+    hashed_password = user_data["hashed_password"]
 
     # Verify password
-    if not verify_password(user.password, user_data["hashed_password"]):
+    if not await _verify_async(user.username, user.password, hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
         )
 
-    # Generate token
-    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        data={"sub": user.username}, expires_delta=access_token_expires
-    )
+    # Upgrade legacy PBKDF2 hashes to Argon2 now that we know the password
+    if password_needs_rehash(hashed_password):
+        await user_ref.update({"hashed_password": await _hash_async(user.password)})
 
-    return {"access_token": access_token, "token_type": "bearer"}
+    return token_response(user.username)
 
 
 @app.get("/api/voices")
-async def get_voices(username: str = Depends(verify_token)):
+async def get_voices(request: Request, username: str = Depends(verify_token)):
     """Get available TTS voices"""
-    voices = [
-        # English (US)
-        {"id": "en-US-Neural2-A", "name": "US English (Female, Neural)", "language": "en-US", "gender": "FEMALE"},
-        {"id": "en-US-Neural2-C", "name": "US English (Male, Neural)", "language": "en-US", "gender": "MALE"},
-        {"id": "en-US-Neural2-D", "name": "US English (Male, Neural)", "language": "en-US", "gender": "MALE"},
-        {"id": "en-US-Neural2-E", "name": "US English (Female, Neural)", "language": "en-US", "gender": "FEMALE"},
-        {"id": "en-US-Neural2-F", "name": "US English (Female, Neural)", "language": "en-US", "gender": "FEMALE"},
-
-        # English (UK)
-        {"id": "en-GB-Neural2-A", "name": "UK English (Female, Neural)", "language": "en-GB", "gender": "FEMALE"},
-        {"id": "en-GB-Neural2-B", "name": "UK English (Male, Neural)", "language": "en-GB", "gender": "MALE"},
-        {"id": "en-GB-Neural2-C", "name": "UK English (Female, Neural)", "language": "en-GB", "gender": "FEMALE"},
-        {"id": "en-GB-Neural2-D", "name": "UK English (Male, Neural)", "language": "en-GB", "gender": "MALE"},
-
-        # English (AU)
-        {"id": "en-AU-Neural2-A", "name": "Australian English (Female, Neural)", "language": "en-AU", "gender": "FEMALE"},
-        {"id": "en-AU-Neural2-B", "name": "Australian English (Male, Neural)", "language": "en-AU", "gender": "MALE"},
-        {"id": "en-AU-Neural2-C", "name": "Australian English (Female, Neural)", "language": "en-AU", "gender": "FEMALE"},
-        {"id": "en-AU-Neural2-D", "name": "Australian English (Male, Neural)", "language": "en-AU", "gender": "MALE"},
-
-        # English (IN)
-        {"id": "en-IN-Neural2-A", "name": "Indian English (Female, Neural)", "language": "en-IN", "gender": "FEMALE"},
-        {"id": "en-IN-Neural2-B", "name": "Indian English (Male, Neural)", "language": "en-IN", "gender": "MALE"},
-    ]
+    if etag_matches(request, _VOICES_ETAG):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=_VOICES_HEADERS)
 
-    return {"voices": voices}
+    return Response(content=_VOICES_BYTES, media_type="application/json", headers=_VOICES_HEADERS)
 
 
 @app.post("/api/synthesize")
-async def synthesize(request: TTSRequest, username: str = Depends(verify_token)):
+async def synthesize(
+    http_request: Request,
+    request: TTSRequest = Depends(json_body(TTSRequest)),
+    username: str = Depends(verify_token),
+):
     """Synthesize text to speech using Google Cloud TTS"""
 
     # Validate input
-    if not request.text or len(request.text.strip()) == 0:
+    if not request.text or request.text.isspace():
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Text cannot be empty",
         )
 
-    if len(request.text) > 5000:
+    # Google TTS limits input by UTF-8 bytes; reject here instead of after a round-trip
+    text_bytes = request.text.encode('utf-8')
+    if len(text_bytes) > MAX_TEXT_LENGTH:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Text exceeds maximum length of 5000 characters",
+            detail=f"Text exceeds {MAX_TEXT_LENGTH} bytes",
         )
+    character_count = len(request.text)
 
-    try:
-        # Extract language code from voice ID (e.g., "en-US" from "en-US-Neural2-A")
-        language_code = "-".join(request.voiceId.split("-")[:2])
+    require_voice(request.voiceId)
 
+    try:
         # Build synthesis request
         synthesis_input = texttospeech.SynthesisInput(text=request.text)
+        voice = get_voice_params(request.voiceId)
+        audio_config = get_audio_config(request.speed, request.pitch)
+
+        # Identical requests reuse earlier audio instead of calling Google TTS
+        cache_key = hashlib.blake2b(
+            f"{request.voiceId}|{audio_config.speaking_rate}|{audio_config.pitch}|".encode()
+            + text_bytes,
+            digest_size=16,
+        ).digest()
+        audio_content = _tts_cache.get(cache_key)
+
+        if audio_content is None:
+            # Perform the text-to-speech request
+            response = await synthesize_speech(
+                input=synthesis_input,
+                voice=voice,
+                audio_config=audio_config
+            )
+            audio_content = response.audio_content
+            _tts_cache.set(cache_key, audio_content)
 
-        voice = texttospeech.VoiceSelectionParams(
-            language_code=language_code,
-            name=request.voiceId
-        )
-
-        audio_config = texttospeech.AudioConfig(
-            audio_encoding=texttospeech.AudioEncoding.MP3,
-            speaking_rate=max(0.25, min(4.0, request.speed)),
-            pitch=max(-20.0, min(20.0, request.pitch)),
-            sample_rate_hertz=24000
-        )
-
-        # Perform the text-to-speech request
-        response = tts_client.synthesize_speech(
-            input=synthesis_input,
-            voice=voice,
-            audio_config=audio_config
-        )
-
-        # Encode audio content to base64
-        audio_content = base64.b64encode(response.audio_content).decode('utf-8')
+            # Track usage (flushed to Firestore in the background)
+            record_usage(username, character_count)
 
-        # Track usage in Firestore
-        if db:
-            user_ref = db.collection('users').document(username)
-            user_ref.update({
-                "total_characters_used": firestore.Increment(len(request.text))
+        # Legacy clients get base64 audio in JSON
+        if wants_json(http_request):
+            return ORJSONResponse({
+                "audioContent": await encode_base64(audio_content),
+                "characterCount": character_count
             })
 
-        return {
-            "audioContent": audio_content,
-            "characterCount": len(request.text)
-        }
+        # Return the MP3 bytes directly; usage goes in a header
+        return Response(
+            content=audio_content,
+            media_type="audio/mpeg",
+            headers={"X-Character-Count": str(character_count)},
+        )
 
     except Exception as e:
         raise HTTPException(
@@ -414,7 +971,7 @@ async def synthesize(request: TTSRequest, username: str = Depends(verify_token))
 
 # Book sync endpoints
 @app.get("/api/books")
-async def get_books(username: str = Depends(verify_token)):
+async def get_books(request: Request, username: str = Depends(verify_token)):
     """Get all book metadata for the user"""
     if not db:
         raise HTTPException(
@@ -423,67 +980,116 @@ async def get_books(username: str = Depends(verify_token)):
         )
 
     books_ref = db.collection('users').document(username).collection('books')
-    books = books_ref.stream()
+    # Project the listing fields server-side so file data never leaves Firestore
+    books = books_ref.select(BOOK_LIST_FIELDS).stream()
 
-    book_list = []
-    for book in books:
-        book_data = book.to_dict()
-        book_data['id'] = book.id
-        book_list.append(book_data)
+    book_list = [{**book.to_dict(), "id": book.id} async for book in books]
 
-    return {"books": book_list}
+    # Let clients revalidate the listing instead of re-downloading it
+    body = orjson.dumps({"books": book_list})
+    headers = {
+        "Cache-Control": "private, no-cache",
+        "ETag": '"' + hashlib.sha1(body).hexdigest() + '"',
+    }
+    if etag_matches(request, headers["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
 
+    return Response(content=body, media_type="application/json", headers=headers)
 
-@app.post("/api/books")
-async def save_book(book: BookMetadata, username: str = Depends(verify_token)):
-    """Save book metadata and file data to Cloud Storage"""
-    if not db:
+
+@app.post("/api/books/upload-url")
+async def create_book_upload_url(
+    upload: BookUpload = Depends(json_body(BookUpload)),
+    username: str = Depends(verify_token),
+):
+    """Return a signed URL for uploading a book file to Cloud Storage"""
+    if not bucket or not signing_credentials:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail="Database not available",
+            detail="Storage not available",
         )
 
-    books_ref = db.collection('users').document(username).collection('books')
+    if upload.fileSize > MAX_BOOK_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Book file exceeds {MAX_BOOK_SIZE} bytes",
+        )
+
+    try:
+        # Generate unique file path: users/{username}/books/{timestamp}_{title}.{ext}
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        safe_title = "".join(c for c in upload.title if c.isalnum() or c in (' ', '-', '_')).rstrip()
+        file_path = f"users/{username}/books/{timestamp}_{safe_title}.{upload.fileType}"
+
+        # The signature covers these headers, so Cloud Storage enforces the size limit
+        upload_headers = {
+            "Content-Type": f"application/{upload.fileType}",
+            "x-goog-content-length-range": f"0,{MAX_BOOK_SIZE}",
+        }
+        upload_url = await run_blocking(
+            generate_signed_url,
+            bucket.blob(file_path),
+            timedelta(minutes=BOOK_URL_EXPIRE_MINUTES),
+            method="PUT",
+            content_type=upload_headers["Content-Type"],
+            headers={"x-goog-content-length-range": upload_headers["x-goog-content-length-range"]},
+        )
+    except Exception as e:
+        print(f"⚠️  Failed to create upload URL: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to create upload URL: {str(e)}",
+        )
 
-    book_data = book.dict(exclude={'fileData'})
-    book_data['uploadedAt'] = datetime.now().isoformat()
+    return {"uploadUrl": upload_url, "uploadHeaders": upload_headers, "storagePath": file_path}
 
-    # Store file in Cloud Storage if provided
-    if book.fileData and bucket:
-        try:
-            # Generate unique file path: users/{username}/books/{timestamp}_{title}.{ext}
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            safe_title = "".join(c for c in book.title if c.isalnum() or c in (' ', '-', '_')).rstrip()
-            file_path = f"users/{username}/books/{timestamp}_{safe_title}.{book.fileType}"
 
-            # Upload to Cloud Storage
-            blob = bucket.blob(file_path)
+@app.post("/api/books")
+async def save_book(
+    book: BookMetadata = Depends(json_body(BookMetadata)),
+    username: str = Depends(verify_token),
+):
+    """Save book metadata, once its file (if any) is in Cloud Storage"""
+    if not db:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Database not available",
+        )
 
-            # Decode base64 and upload
-            file_bytes = base64.b64decode(book.fileData)
-            blob.upload_from_string(file_bytes, content_type=f"application/{book.fileType}")
+    books_ref = db.collection('users').document(username).collection('books')
 
-            # Store the Cloud Storage path in Firestore
-            book_data['storagePath'] = file_path
-            book_data['fileSize'] = len(file_bytes)
+    book_data = msgspec.structs.asdict(book)
+    book_data['uploadedAt'] = now_iso()
 
-            print(f"✅ Uploaded book to Cloud Storage: {file_path}")
-        except Exception as e:
-            print(f"⚠️  Failed to upload to Cloud Storage: {e}")
+    # Only record a file that was actually uploaded, so other devices never
+    # list a book whose download would fail
+    if book.storagePath is not None:
+        if not bucket:
             raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Failed to upload book file: {str(e)}",
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Storage not available",
             )
+        blob = None
+        if book.storagePath.startswith(f"users/{username}/books/"):
+            blob = await run_blocking(bucket.get_blob, book.storagePath)
+        if blob is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Book file has not been uploaded",
+            )
+        book_data['fileSize'] = blob.size
+    else:
+        del book_data['storagePath']
 
     # Add book metadata to Firestore
-    doc_ref = books_ref.add(book_data)
+    doc_ref = await books_ref.add(book_data)
 
     return {"id": doc_ref[1].id, **book_data}
 
 
 @app.get("/api/books/{book_id}/download")
 async def download_book(book_id: str, username: str = Depends(verify_token)):
-    """Download book file from Cloud Storage"""
+    """Get a signed URL for downloading the book file from Cloud Storage"""
     if not db:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
@@ -492,7 +1098,7 @@ async def download_book(book_id: str, username: str = Depends(verify_token)):
 
     # Get book metadata
     book_ref = db.collection('users').document(username).collection('books').document(book_id)
-    book_doc = book_ref.get()
+    book_doc = await book_ref.get(field_paths=["storagePath", "title", "author", "fileType"])
 
     if not book_doc.exists:
         raise HTTPException(
@@ -509,16 +1115,21 @@ async def download_book(book_id: str, username: str = Depends(verify_token)):
             detail="Book file not found in storage",
         )
 
+    if not signing_credentials:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Storage not available",
+        )
+
     try:
-        # Download from Cloud Storage
+        # The client fetches the file directly from Cloud Storage
         blob = bucket.blob(storage_path)
-        file_bytes = blob.download_as_bytes()
-
-        # Return as base64
-        file_base64 = base64.b64encode(file_bytes).decode('utf-8')
+        download_url = await run_blocking(
+            generate_signed_url, blob, timedelta(minutes=BOOK_URL_EXPIRE_MINUTES)
+        )
 
         return {
-            "fileData": file_base64,
+            "downloadUrl": download_url,
             "title": book_data.get('title'),
             "author": book_data.get('author'),
             "fileType": book_data.get('fileType')
@@ -541,7 +1152,7 @@ async def delete_book(book_id: str, username: str = Depends(verify_token)):
 
     # Get book to find storage path
     book_ref = db.collection('users').document(username).collection('books').document(book_id)
-    book_doc = book_ref.get()
+    book_doc = await book_ref.get(field_paths=["storagePath"])
 
     if book_doc.exists:
         book_data = book_doc.to_dict()
@@ -551,13 +1162,13 @@ async def delete_book(book_id: str, username: str = Depends(verify_token)):
         if storage_path and bucket:
             try:
                 blob = bucket.blob(storage_path)
-                blob.delete()
+                await run_blocking(blob.delete)
                 print(f"✅ Deleted book from Cloud Storage: {storage_path}")
             except Exception as e:
                 print(f"⚠️  Failed to delete from Cloud Storage: {e}")
 
     # Delete from Firestore
-    book_ref.delete()
+    await book_ref.delete()
 
     return {"status": "deleted", "id": book_id}
 
@@ -572,16 +1183,19 @@ async def get_position(book_id: str, username: str = Depends(verify_token)):
         )
 
     position_ref = db.collection('users').document(username).collection('positions').document(book_id)
-    position_doc = position_ref.get()
+    position_doc = await position_ref.get()
 
     if not position_doc.exists:
-        return None
+        return ORJSONResponse(None)
 
-    return position_doc.to_dict()
+    return ORJSONResponse(position_doc.to_dict())
 
 
 @app.post("/api/positions")
-async def save_position(position: ReadingPosition, username: str = Depends(verify_token)):
+async def save_position(
+    position: ReadingPosition = Depends(json_body(ReadingPosition)),
+    username: str = Depends(verify_token),
+):
     """Save reading position for a book"""
     if not db:
         raise HTTPException(
@@ -589,14 +1203,32 @@ async def save_position(position: ReadingPosition, username: str = Depends(verif
             detail="Database not available",
         )
 
+    # Reject IDs Firestore would refuse now, rather than when the batch commits
+    if not is_valid_document_id(position.bookId):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid book ID",
+        )
     position_ref = db.collection('users').document(username).collection('positions').document(position.bookId)
 
-    position_data = position.dict()
-    position_data['lastRead'] = datetime.now().isoformat()
+    position_data = msgspec.structs.asdict(position)
+    position_data['lastRead'] = now_iso()
 
-    position_ref.set(position_data)
+    # Committed to Firestore together with other saves in the next batch
+    try:
+        await queue_position(username, position_ref, position_data)
+    except _PERMANENT_WRITE_ERRORS as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Failed to save reading position: {str(e)}",
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Failed to save reading position: {str(e)}",
+        )
 
-    return position_data
+    return ORJSONResponse(position_data)
 
 
 # Chunk audio generation endpoints
@@ -611,27 +1243,16 @@ async def generate_chunk_audio(request: ChunkAudioRequest, username: str = Depen
             detail="Database or storage not available",
         )
 
-    try:
-        # Extract language code from voice ID
-        language_code = "-".join(request.voiceId.split("-")[:2])
+    require_voice(request.voiceId)
 
+    try:
         # Build synthesis request
         synthesis_input = texttospeech.SynthesisInput(text=request.text)
-
-        voice = texttospeech.VoiceSelectionParams(
-            language_code=language_code,
-            name=request.voiceId
-        )
-
-        audio_config = texttospeech.AudioConfig(
-            audio_encoding=texttospeech.AudioEncoding.MP3,
-            speaking_rate=max(0.25, min(4.0, request.speed)),
-            pitch=max(-20.0, min(20.0, request.pitch)),
-            sample_rate_hertz=24000
-        )
+        voice = get_voice_params(request.voiceId)
+        audio_config = get_audio_config(request.speed, request.pitch)
 
         # Perform the text-to-speech request
-        response = tts_client.synthesize_speech(
+        response = await synthesize_speech(
             input=synthesis_input,
             voice=voice,
             audio_config=audio_config
@@ -641,32 +1262,20 @@ async def generate_chunk_audio(request: ChunkAudioRequest, username: str = Depen
         audio_path = f"users/{username}/audio/{request.bookId}/chapter_{request.chapterIndex}/chunk_{request.chunkId}.mp3"
 
         blob = bucket.blob(audio_path)
-        blob.upload_from_string(response.audio_content, content_type="audio/mpeg")
-
-        # Refresh credentials to get fresh access token
-        signing_credentials.refresh(google_requests.Request())
+        await run_blocking(blob.upload_from_string, response.audio_content, content_type="audio/mpeg")
 
         # Generate signed URL using IAM (valid for 7 days)
-        audio_url = blob.generate_signed_url(
-            version="v4",
-            expiration=timedelta(days=7),
-            method="GET",
-            service_account_email=SERVICE_ACCOUNT_EMAIL,
-            access_token=signing_credentials.token
-        )
+        audio_url = await run_blocking(generate_signed_url, blob, timedelta(days=7))
 
         # Track usage
-        user_ref = db.collection('users').document(username)
-        user_ref.update({
-            "total_characters_used": firestore.Increment(len(request.text))
-        })
+        record_usage(username, len(request.text))
 
         print(f"✅ Generated chunk audio: {audio_path} ({len(request.text)} chars)")
 
         return ChunkAudioResponse(
             audioUrl=audio_url,
             chunkId=request.chunkId,
-            generatedAt=datetime.now().isoformat()
+            generatedAt=now_iso()
         )
 
     except Exception as e:
@@ -692,23 +1301,14 @@ async def get_chunk_audio(book_id: str, chapter_index: int, chunk_id: int, usern
     audio_path = f"users/{username}/audio/{book_id}/chapter_{chapter_index}/chunk_{chunk_id}.mp3"
     blob = bucket.blob(audio_path)
 
-    if not blob.exists():
+    if not await run_blocking(blob.exists):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Chunk audio not found. Generate it first.",
         )
 
-    # Refresh credentials to get fresh access token
-    signing_credentials.refresh(google_requests.Request())
-
     # Generate fresh signed URL using IAM
-    audio_url = blob.generate_signed_url(
-        version="v4",
-        expiration=timedelta(days=7),
-        method="GET",
-        service_account_email=SERVICE_ACCOUNT_EMAIL,
-        access_token=signing_credentials.token
-    )
+    audio_url = await run_blocking(generate_signed_url, blob, timedelta(days=7))
 
     return {
         "audioUrl": audio_url,
@@ -733,12 +1333,12 @@ async def collect_logs(log: LogEntry, username: str = Depends(verify_token)):
             "level": log.level,
             "message": log.message,
             "context": log.context or {},
-            "timestamp": log.timestamp or datetime.now().isoformat(),
-            "received_at": datetime.now().isoformat()
+            "timestamp": log.timestamp or now_iso(),
+            "received_at": now_iso()
         }
 
         # Add to logs collection
-        db.collection('frontend_logs').add(log_data)
+        await db.collection('frontend_logs').add(log_data)
 
         # Also print to console for immediate visibility
         print(f"[FE LOG - {log.level.upper()}] {username}: {log.message}")
@@ -754,4 +1354,11 @@ async def collect_logs(log: LogEntry, username: str = Depends(verify_token)):
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=8000,
+        loop="uvloop",
+        http="httptools",
+        workers=int(os.getenv("WEB_CONCURRENCY", os.cpu_count())),
+    )
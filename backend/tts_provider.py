@@ -7,9 +7,132 @@ from abc import ABC, abstractmethod
 from typing import List, Tuple, Dict
 from dataclasses import dataclass
 from google.cloud import texttospeech_v1beta1 as tts
+from xml.sax.saxutils import escape
+import asyncio
 import os
 
 
+# Available TTS voices
+VOICES = [
+    # English (US)
+    {"id": "en-US-Neural2-A", "name": "US English (Female, Neural)", "language": "en-US", "gender": "FEMALE"},
+    {"id": "en-US-Neural2-C", "name": "US English (Male, Neural)", "language": "en-US", "gender": "MALE"},
+    {"id": "en-US-Neural2-D", "name": "US English (Male, Neural)", "language": "en-US", "gender": "MALE"},
+    {"id": "en-US-Neural2-E", "name": "US English (Female, Neural)", "language": "en-US", "gender": "FEMALE"},
+    {"id": "en-US-Neural2-F", "name": "US English (Female, Neural)", "language": "en-US", "gender": "FEMALE"},
+
+    # English (UK)
+    {"id": "en-GB-Neural2-A", "name": "UK English (Female, Neural)", "language": "en-GB", "gender": "FEMALE"},
+    {"id": "en-GB-Neural2-B", "name": "UK English (Male, Neural)", "language": "en-GB", "gender": "MALE"},
+    {"id": "en-GB-Neural2-C", "name": "UK English (Female, Neural)", "language": "en-GB", "gender": "FEMALE"},
+    {"id": "en-GB-Neural2-D", "name": "UK English (Male, Neural)", "language": "en-GB", "gender": "MALE"},
+
+    # English (AU)
+    {"id": "en-AU-Neural2-A", "name": "Australian English (Female, Neural)", "language": "en-AU", "gender": "FEMALE"},
+    {"id": "en-AU-Neural2-B", "name": "Australian English (Male, Neural)", "language": "en-AU", "gender": "MALE"},
+    {"id": "en-AU-Neural2-C", "name": "Australian English (Female, Neural)", "language": "en-AU", "gender": "FEMALE"},
+    {"id": "en-AU-Neural2-D", "name": "Australian English (Male, Neural)", "language": "en-AU", "gender": "MALE"},
+
+    # English (IN)
+    {"id": "en-IN-Neural2-A", "name": "Indian English (Female, Neural)", "language": "en-IN", "gender": "FEMALE"},
+    {"id": "en-IN-Neural2-B", "name": "Indian English (Male, Neural)", "language": "en-IN", "gender": "MALE"},
+]
+
+# Voice ID -> language code, e.g. "en-US-Neural2-A" -> "en-US"
+VOICE_LANGUAGES = {voice["id"]: voice["language"] for voice in VOICES}
+
+
+# MPEG audio Layer III frame header tables, indexed by the header's version bits
+# (3 = MPEG-1, 2 = MPEG-2, 0 = MPEG-2.5)
+_MP3_BITRATES = {
+    3: (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    2: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    0: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+_MP3_SAMPLE_RATES = {
+    3: (44100, 48000, 32000),
+    2: (22050, 24000, 16000),
+    0: (11025, 12000, 8000),
+}
+
+
+def _skip_id3(data: bytes) -> int:
+    """Offset of the first byte after a leading ID3v2 tag (0 if there is none)"""
+    if len(data) < 10 or data[:3] != b"ID3":
+        return 0
+    size = 0
+    for byte in data[6:10]:  # syncsafe integer, 7 bits per byte
+        size = (size << 7) | (byte & 0x7F)
+    footer = 10 if data[5] & 0x10 else 0
+    return 10 + size + footer
+
+
+def _mp3_frames(data: bytes):
+    """
+    Walk the MPEG Layer III frames in data
+
+    Yields (offset, length, samples, sample_rate, info) per frame, where info
+    is the offset of the "Xing"/"Info" tag if the frame is a leading header
+    frame that carries no audio, and None otherwise.
+    """
+    offset = _skip_id3(data)
+    end = len(data)
+    first = True
+    while offset + 4 <= end:
+        b1, b2, b3 = data[offset + 1], data[offset + 2], data[offset + 3]
+        version = (b1 >> 3) & 3
+        layer = (b1 >> 1) & 3
+        bitrate_index = b2 >> 4
+        rate_index = (b2 >> 2) & 3
+        if (data[offset] != 0xFF or (b1 & 0xE0) != 0xE0 or version == 1 or layer != 1
+                or bitrate_index in (0, 15) or rate_index == 3):
+            # Not a frame header: resync on the next byte
+            offset += 1
+            continue
+
+        bitrate = _MP3_BITRATES[version][bitrate_index] * 1000
+        sample_rate = _MP3_SAMPLE_RATES[version][rate_index]
+        padding = (b2 >> 1) & 1
+        if version == 3:
+            samples, length = 1152, 144 * bitrate // sample_rate + padding
+        else:
+            samples, length = 576, 72 * bitrate // sample_rate + padding
+        if offset + length > end:
+            break
+
+        info = None
+        if first:
+            mono = (b3 >> 6) == 3
+            side_info = (17 if mono else 32) if version == 3 else (9 if mono else 17)
+            if data[offset + 4 + side_info:offset + 8 + side_info] in (b"Xing", b"Info"):
+                info = offset + 4 + side_info
+            first = False
+
+        yield offset, length, samples, sample_rate, info
+        offset += length
+
+
+def _mp3_duration(data: bytes) -> float:
+    """Duration of MP3 audio in seconds"""
+    duration = 0.0
+    for _, _, samples, sample_rate, info in _mp3_frames(data):
+        if info is None:
+            duration += samples / sample_rate
+        elif data[info + 7] & 1:
+            # The Xing/Info header records the frame count; no need to walk the rest
+            frames = int.from_bytes(data[info + 8:info + 12], "big")
+            return frames * samples / sample_rate
+    return duration
+
+
+def _mp3_audio(data: bytes) -> bytes:
+    """MP3 data without its ID3v2 tag and Xing/Info frame, ready to concatenate"""
+    for offset, _, _, _, info in _mp3_frames(data):
+        if info is None:
+            return data[offset:]
+    return b""
+
+
 @dataclass
 class ChunkTiming:
     """Timing information for a text chunk"""
@@ -30,7 +153,7 @@ class TTSProvider(ABC):
     """Abstract base class for TTS providers"""
 
     @abstractmethod
-    def synthesize_with_marks(
+    async def synthesize_with_marks(
         self,
         chunks: List[Dict],  # [{"chunkId": int, "text": str}]
         voice_id: str,
@@ -55,10 +178,48 @@ class TTSProvider(ABC):
 class GoogleTTSProvider(TTSProvider):
     """Google Cloud Text-to-Speech provider"""
 
-    def __init__(self):
-        self.client = tts.TextToSpeechClient()
+    def __init__(self, max_concurrency: int = None):
+        if max_concurrency is None:
+            max_concurrency = int(os.getenv("TTS_MAX_CONCURRENCY", "8"))
+        self.max_concurrency = max_concurrency
+        self._client = None
+        self._semaphore = None
+
+    @property
+    def client(self) -> tts.TextToSpeechAsyncClient:
+        # Created on first use so the async gRPC channel binds to the running loop
+        if self._client is None:
+            self._client = tts.TextToSpeechAsyncClient()
+        return self._client
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        # Bounds concurrent synthesis calls; created lazily for the same reason
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    @staticmethod
+    def _voice_and_audio_config(voice_id: str, speed: float, pitch: float):
+        # Look up language code
+        language_code = VOICE_LANGUAGES.get(voice_id)
+        if language_code is None:
+            raise ValueError(f"Unknown voice: {voice_id}")
+
+        voice = tts.VoiceSelectionParams(
+            language_code=language_code,
+            name=voice_id
+        )
 
-    def synthesize_with_marks(
+        audio_config = tts.AudioConfig(
+            audio_encoding=tts.AudioEncoding.MP3,
+            speaking_rate=max(0.25, min(4.0, speed)),
+            pitch=max(-20.0, min(20.0, pitch)),
+            sample_rate_hertz=24000
+        )
+        return voice, audio_config
+
+    async def synthesize_with_marks(
         self,
         chunks: List[Dict],
         voice_id: str,
@@ -68,38 +229,17 @@ class GoogleTTSProvider(TTSProvider):
         """
         Synthesize using Google TTS with SSML marks
         """
-        # Build SSML with mark tags for each chunk
-        ssml_parts = ['<speak>']
-
-        for chunk in chunks:
-            chunk_id = chunk['chunkId']
-            text = chunk['text']
-
-            # Add mark before each chunk
-            ssml_parts.append(f'<mark name="chunk_{chunk_id}"/>')
-            ssml_parts.append(text)
-            ssml_parts.append(' ')  # Space between chunks
-
-        ssml_parts.append('</speak>')
-        ssml_text = ''.join(ssml_parts)
-
-        # Extract language code
-        language_code = "-".join(voice_id.split("-")[:2])
+        # Build SSML with a mark before each chunk; text is escaped so
+        # "&", "<" and ">" don't break the markup
+        body = ''.join(
+            f'<mark name="chunk_{chunk["chunkId"]}"/>{escape(chunk["text"])} '
+            for chunk in chunks
+        )
+        ssml_text = f'<speak>{body}</speak>'
 
         # Build synthesis request
         synthesis_input = tts.SynthesisInput(ssml=ssml_text)
-
-        voice = tts.VoiceSelectionParams(
-            language_code=language_code,
-            name=voice_id
-        )
-
-        audio_config = tts.AudioConfig(
-            audio_encoding=tts.AudioEncoding.MP3,
-            speaking_rate=max(0.25, min(4.0, speed)),
-            pitch=max(-20.0, min(20.0, pitch)),
-            sample_rate_hertz=24000
-        )
+        voice, audio_config = self._voice_and_audio_config(voice_id, speed, pitch)
 
         # Build request with enable_time_pointing
         request = tts.SynthesizeSpeechRequest(
@@ -110,7 +250,8 @@ class GoogleTTSProvider(TTSProvider):
         )
 
         # Synthesize
-        response = self.client.synthesize_speech(request=request)
+        async with self.semaphore:
+            response = await self.client.synthesize_speech(request=request)
 
         # Extract timing information from timepoints
         chunk_timings = []
@@ -126,16 +267,13 @@ class GoogleTTSProvider(TTSProvider):
                     start_time=start_time
                 ))
 
-        # Sort by chunk_id to ensure correct order
-        chunk_timings.sort(key=lambda x: x.chunk_id)
+        # Timepoints arrive in audio order, which is chunk_id order unless the
+        # caller passed chunks out of order; only sort in that case
+        if any(a.chunk_id > b.chunk_id for a, b in zip(chunk_timings, chunk_timings[1:])):
+            chunk_timings.sort(key=lambda x: x.chunk_id)
 
-        # Estimate duration (last mark time + average chunk duration)
-        if chunk_timings:
-            last_timing = chunk_timings[-1]
-            # Rough estimate: add 5 seconds for the last chunk
-            duration = last_timing.start_time + 5.0
-        else:
-            duration = 0.0
+        # Measure duration from the MP3 frames
+        duration = _mp3_duration(response.audio_content)
 
         return TTSResult(
             audio_bytes=response.audio_content,
@@ -145,10 +283,60 @@ class GoogleTTSProvider(TTSProvider):
         )
 
 
+    async def synthesize_with_marks_parallel(
+        self,
+        chunks: List[Dict],
+        voice_id: str,
+        speed: float = 1.0,
+        pitch: float = 0,
+        max_concurrent: int = 3
+    ) -> TTSResult:
+        """
+        Synthesize each chunk as its own Google TTS request, a few at a time
+
+        Chunk start times are the running sum of the preceding chunks' audio
+        durations, so no SSML marks are needed.
+        """
+        voice, audio_config = self._voice_and_audio_config(voice_id, speed, pitch)
+        limit = asyncio.Semaphore(max_concurrent)
+
+        async def synthesize_chunk(chunk: Dict) -> bytes:
+            request = tts.SynthesizeSpeechRequest(
+                input=tts.SynthesisInput(text=chunk['text']),
+                voice=voice,
+                audio_config=audio_config
+            )
+            async with limit, self.semaphore:
+                response = await self.client.synthesize_speech(request=request)
+            return response.audio_content
+
+        # gather() keeps results in chunk order
+        audio_parts = await asyncio.gather(*(synthesize_chunk(chunk) for chunk in chunks))
+
+        chunk_timings = []
+        frames = []
+        start_time = 0.0
+        for chunk, audio in zip(chunks, audio_parts):
+            chunk_timings.append(ChunkTiming(
+                chunk_id=chunk['chunkId'],
+                start_time=start_time
+            ))
+            start_time += _mp3_duration(audio)
+            # MP3 frames are self-contained, so the parts can simply be joined
+            frames.append(_mp3_audio(audio))
+
+        return TTSResult(
+            audio_bytes=b''.join(frames),
+            chunk_timings=chunk_timings,
+            duration=start_time,
+            provider="google"
+        )
+
+
 class CustomTTSProvider(TTSProvider):
     """Placeholder for future custom TTS service"""
 
-    def synthesize_with_marks(
+    async def synthesize_with_marks(
         self,
         chunks: List[Dict],
         voice_id: str,
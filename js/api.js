@@ -172,7 +172,7 @@ class TTSApiClient {
      * @param {string} voiceId - Voice ID (e.g., 'en-US-Neural2-A')
      * @param {number} speed - Speaking rate (0.25 - 4.0)
      * @param {number} pitch - Pitch adjustment (-20.0 to 20.0)
-     * @returns {Promise<{audioContent: string, characterCount: number}>}
+     * @returns {Promise<{audioBlob: Blob, characterCount: number}>}
      */
     async synthesize(text, voiceId, speed = 1.0, pitch = 0) {
         if (!this.isOnline) {
@@ -208,8 +208,10 @@ class TTSApiClient {
                 throw new Error(errorData.detail || 'Failed to synthesize speech');
             }
 
-            const data = await response.json();
-            return data;
+            // Response body is the raw MP3; character count comes in a header
+            const audioBlob = await response.blob();
+            const characterCount = parseInt(response.headers.get('X-Character-Count'), 10) || 0;
+            return { audioBlob, characterCount };
         } catch (error) {
             console.error('Synthesis error:', error);
             throw error;
@@ -262,9 +264,11 @@ class TTSApiClient {
     }
 
     /**
-     * Save book metadata to backend
+     * Save book metadata (and optionally the file) to backend
+     * @param {object} bookMetadata - {title, author, fileType, uploadedAt}
+     * @param {Blob} [fileBlob] - Book file, uploaded directly to Cloud Storage
      */
-    async saveBook(bookMetadata) {
+    async saveBook(bookMetadata, fileBlob = null) {
         if (!this.isOnline) {
             throw new Error('No internet connection');
         }
@@ -274,10 +278,46 @@ class TTSApiClient {
         }
 
         try {
+            let metadata = bookMetadata;
+
+            // Upload the file straight to Cloud Storage first, so the book is
+            // only recorded once its file exists
+            if (fileBlob) {
+                const urlResponse = await fetch(`${this.apiUrl}/api/books/upload-url`, {
+                    method: 'POST',
+                    headers: this.getAuthHeaders(),
+                    body: JSON.stringify({
+                        title: bookMetadata.title,
+                        fileType: bookMetadata.fileType,
+                        fileSize: fileBlob.size
+                    })
+                });
+
+                if (!urlResponse.ok) {
+                    if (urlResponse.status === 401) {
+                        this.logout();
+                        throw new Error('Session expired. Please login again.');
+                    }
+                    throw new Error('Failed to upload book file');
+                }
+
+                const upload = await urlResponse.json();
+                const uploadResponse = await fetch(upload.uploadUrl, {
+                    method: 'PUT',
+                    headers: upload.uploadHeaders,
+                    body: fileBlob
+                });
+                if (!uploadResponse.ok) {
+                    throw new Error('Failed to upload book file');
+                }
+
+                metadata = { ...bookMetadata, storagePath: upload.storagePath };
+            }
+
             const response = await fetch(`${this.apiUrl}/api/books`, {
                 method: 'POST',
                 headers: this.getAuthHeaders(),
-                body: JSON.stringify(bookMetadata)
+                body: JSON.stringify(metadata)
             });
 
             if (!response.ok) {
@@ -297,6 +337,7 @@ class TTSApiClient {
 
     /**
      * Download book file from backend
+     * @returns {Promise<{title: string, author: string|null, fileType: string, fileBytes: Uint8Array}>}
      */
     async downloadBook(bookId) {
         if (!this.isOnline) {
@@ -321,7 +362,19 @@ class TTSApiClient {
                 throw new Error('Failed to download book');
             }
 
-            return await response.json();
+            // Fetch the file straight from Cloud Storage via the signed URL
+            const data = await response.json();
+            const fileResponse = await fetch(data.downloadUrl);
+            if (!fileResponse.ok) {
+                throw new Error('Failed to download book file');
+            }
+
+            return {
+                title: data.title,
+                author: data.author,
+                fileType: data.fileType,
+                fileBytes: new Uint8Array(await fileResponse.arrayBuffer())
+            };
         } catch (error) {
             console.error('Failed to download book:', error);
             throw error;
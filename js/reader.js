@@ -17,7 +17,7 @@ class AudioPlaybackManager {
         this.isNewParagraph = true;
 
         // Prefetch buffer - keep 2-3 chunks ahead as Blob URLs
-        this.prefetchBuffer = new Map(); // chunkIndex -> {blobUrl, audioContent}
+        this.prefetchBuffer = new Map(); // chunkIndex -> {blobUrl, audioBlob}
         this.maxPrefetchAhead = 2;
 
         // Retry state
@@ -283,7 +283,7 @@ class AudioPlaybackManager {
                 // Fetch and create blob URL
                 console.log(`⬇️ Fetching chunk ${chunkIndex}...`);
                 const result = await this.ttsApi.synthesize(chunk, voiceId, speed, pitch);
-                blobUrl = this.createBlobUrl(result.audioContent);
+                blobUrl = this.createBlobUrl(result.audioBlob);
 
                 // Track usage (important for billing/quotas)
                 if (this.onUsageTracked && result.characterCount) {
@@ -333,7 +333,7 @@ class AudioPlaybackManager {
                     console.log(`⬇️ Prefetching chunk ${prefetchIndex}...`);
 
                     const result = await this.ttsApi.synthesize(chunk, voiceId, speed, pitch);
-                    const blobUrl = this.createBlobUrl(result.audioContent);
+                    const blobUrl = this.createBlobUrl(result.audioBlob);
 
                     // Track usage for prefetched chunks too
                     if (this.onUsageTracked && result.characterCount) {
@@ -342,7 +342,7 @@ class AudioPlaybackManager {
 
                     this.prefetchBuffer.set(prefetchIndex, {
                         blobUrl,
-                        audioContent: result.audioContent
+                        audioBlob: result.audioBlob
                     });
 
                     console.log(`✅ Prefetched chunk ${prefetchIndex}`);
@@ -353,15 +353,9 @@ class AudioPlaybackManager {
         }
     }
 
-    createBlobUrl(base64Audio) {
-        // Convert base64 to Blob URL (better memory management than data URLs)
-        const binaryString = atob(base64Audio);
-        const bytes = new Uint8Array(binaryString.length);
-        for (let i = 0; i < binaryString.length; i++) {
-            bytes[i] = binaryString.charCodeAt(i);
-        }
-        const blob = new Blob([bytes], { type: 'audio/mp3' });
-        const blobUrl = URL.createObjectURL(blob);
+    createBlobUrl(audioBlob) {
+        // Blob URL (better memory management than data URLs)
+        const blobUrl = URL.createObjectURL(audioBlob);
 
         this.activeBlobUrls.add(blobUrl);
         return blobUrl;
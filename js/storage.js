@@ -51,25 +51,16 @@ class StorageManager {
                 // Sync book (including file data) to backend
                 if (typeof ttsApi !== 'undefined' && ttsApi.isAuthenticated()) {
                     try {
-                        // Convert fileData array to base64 (handle large files)
-                        const uint8Array = new Uint8Array(book.fileData);
-                        let binary = '';
-                        const chunkSize = 8192;
-                        for (let i = 0; i < uint8Array.length; i += chunkSize) {
-                            const chunk = uint8Array.subarray(i, Math.min(i + chunkSize, uint8Array.length));
-                            binary += String.fromCharCode.apply(null, chunk);
-                        }
-                        const base64Data = btoa(binary);
-
-                        console.log(`Uploading book "${book.title}" (${Math.round(base64Data.length / 1024)}KB)`);
+                        const fileBlob = new Blob([new Uint8Array(book.fileData)]);
+
+                        console.log(`Uploading book "${book.title}" (${Math.round(fileBlob.size / 1024)}KB)`);
 
                         const result = await ttsApi.saveBook({
                             title: book.title,
                             author: book.author,
                             fileType: book.fileType,
-                            uploadedAt: book.addedDate,
-                            fileData: base64Data
-                        });
+                            uploadedAt: book.addedDate
+                        }, fileBlob);
                         book.syncedToBackend = true;
                         book.backendId = result.id;
                         console.log(`✅ Book uploaded successfully: "${book.title}"`);
@@ -130,13 +121,6 @@ class StorageManager {
                     try {
                         const bookData = await ttsApi.downloadBook(backendBook.id);
 
-                        // Convert base64 to array
-                        const binaryString = atob(bookData.fileData);
-                        const bytes = new Uint8Array(binaryString.length);
-                        for (let i = 0; i < binaryString.length; i++) {
-                            bytes[i] = binaryString.charCodeAt(i);
-                        }
-
                         // Add to local database
                         const tx2 = this.db.transaction(['books'], 'readwrite');
                         const store2 = tx2.objectStore('books');
@@ -146,7 +130,7 @@ class StorageManager {
                             title: bookData.title,
                             author: bookData.author,
                             fileType: bookData.fileType,
-                            fileData: Array.from(bytes),
+                            fileData: Array.from(bookData.fileBytes),
                             addedDate: new Date().toISOString(),
                             syncedToBackend: true,
                             backendId: backendBook.id